@@ -5,9 +5,141 @@ This version simulates MeTTa-like behavior using pure Python, making it easy to
 The logic and concepts remain the same, but without requiring the complex hyperon/Conan build.
 """
 
-import random
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple
 
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional; the pure-Python kernels below are used as-is.
+    njit = None
+
+
+# Reputation bounds shared by every update path
+_REP_MIN = 0.0
+_REP_MAX = 200.0
+
+
+def _step_kernel(rep, action, actor_idx, partner_idx, amount):
+    """
+    Apply one action to the reputation array in place.
+
+    Action codes: 0=contribute, 1=share, 2=trade, 3=idle. A negative
+    partner_idx means no trade partner was available.
+    """
+    if action == 0:
+        rep[actor_idx] = min(_REP_MAX, rep[actor_idx] + 15.0)
+    elif action == 1:
+        rep[actor_idx] = min(_REP_MAX, rep[actor_idx] + 8.0)
+    elif action == 2:
+        if partner_idx >= 0 and rep[actor_idx] >= amount:
+            rep[actor_idx] -= amount
+            # Positive-sum: receiver gets 1.1x the amount
+            rep[partner_idx] += amount * 1.1
+    else:  # idle
+        rep[actor_idx] = max(_REP_MIN, rep[actor_idx] - 2.0)
+
+
+def _batch_kernel(rep, actors, acts, partners, amounts):
+    """
+    Apply a pre-drawn sequence of actions in chronological order.
+
+    Mirrors _step_kernel per slot, so balances are clamped between
+    actions exactly as in step(). A negative partner index means no
+    trade partner was available.
+    """
+    for k in range(actors.size):
+        i = actors[k]
+        action = acts[k]
+        if action == 0:
+            rep[i] = min(_REP_MAX, rep[i] + 15.0)
+        elif action == 1:
+            rep[i] = min(_REP_MAX, rep[i] + 8.0)
+        elif action == 2:
+            j = partners[k]
+            amount = amounts[k]
+            if j >= 0 and rep[i] >= amount:
+                rep[i] -= amount
+                # Positive-sum: receiver gets 1.1x the amount
+                rep[j] += amount * 1.1
+        else:  # idle
+            rep[i] = max(_REP_MIN, rep[i] - 2.0)
+
+
+if njit is not None:
+    # nogil lets independent simulations overlap in threads
+    _step_kernel = njit(cache=True, nogil=True)(_step_kernel)
+    _batch_kernel = njit(cache=True, nogil=True)(_batch_kernel)
+    # Compile (or load the on-disk cache) at import time so the first
+    # simulation step never stalls a live dashboard run on JIT latency
+    _warm = np.zeros(1, dtype=np.float32)
+    _step_kernel(_warm, 3, 0, -1, 0.0)
+    _batch_kernel(_warm, np.zeros(1, dtype=np.int64),
+                  np.full(1, 3, dtype=np.int64),
+                  np.full(1, -1, dtype=np.int64), np.zeros(1))
+    del _warm
+
+
+# Action names indexed by the kernel's action codes
+_ACTIONS = ('contribute', 'share', 'trade', 'idle')
+
+
+# Cache of generated step functions keyed by (num_agents, weights)
+_specialized_cache = {}
+
+
+def _build_specialized_step(num_agents, weights):
+    """
+    Generate a step function specialized for a fixed agent count and
+    action-weight table (partial evaluation). The weights become literal
+    thresholds on one uniform draw and the clip bounds are inlined, so
+    the common non-trade actions run without any table lookups. Compiled
+    once per distinct (num_agents, weights) pair.
+    """
+    key = (num_agents, weights)
+    fn = _specialized_cache.get(key)
+    if fn is None:
+        c1 = weights[0]
+        c2 = c1 + weights[1]
+        c3 = c2 + weights[2]
+        src = (
+            f"def _specialized_step(rep, rng):\n"
+            f"    actor = int(rng.integers({num_agents}))\n"
+            f"    old = float(rep[actor])\n"
+            f"    r = rng.random()\n"
+            f"    if r < {c1!r}:\n"
+            f"        rep[actor] = min({_REP_MAX!r}, old + 15.0)\n"
+            f"        return actor, 0, old\n"
+            f"    if r < {c2!r}:\n"
+            f"        rep[actor] = min({_REP_MAX!r}, old + 8.0)\n"
+            f"        return actor, 1, old\n"
+            f"    if r < {c3!r}:\n"
+            f"        return actor, 2, old\n"
+            f"    rep[actor] = max({_REP_MIN!r}, old - 2.0)\n"
+            f"    return actor, 3, old\n"
+        )
+        namespace = {}
+        exec(compile(src, '<specialized-step>', 'exec'), namespace)
+        fn = namespace['_specialized_step']
+        _specialized_cache[key] = fn
+    return fn
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_command(command: str) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Parse a !(rule arg ...) command into (rule, args).
+
+    Commands repeat heavily in a simulation (same agent, same action),
+    so the parse result is memoized to skip the string slicing and split.
+    """
+    parts = command[2:-1].split()
+    return parts[0], tuple(parts[1:])
+
 
 class SimpleMeTTaRuntime:
     """
@@ -18,6 +150,12 @@ class SimpleMeTTaRuntime:
     def __init__(self):
         self.rules = {}
         self.grounded_functions = {}
+        # Typed entry points bound by the simulation once the rules are
+        # loaded. Calling these skips command parsing and dict dispatch.
+        self.contribute = None
+        self.share = None
+        self.idle = None
+        self.transfer = None
     
     def register_function(self, name: str, func):
         """Register a grounded function."""
@@ -31,13 +169,17 @@ class SimpleMeTTaRuntime:
         """Execute a command (simplified MeTTa-like interface)."""
         # Parse simple commands like !(action-contribute Agent_0)
         if command.startswith('!(') and command.endswith(')'):
-            parts = command[2:-1].split()
-            action = parts[0]
-            args = parts[1:] if len(parts) > 1 else []
-            
+            action, args = _parse_command(command)
             if action in self.rules:
                 return self.rules[action](*args)
-        
+
+        return None
+
+    def run_parsed(self, rule_name: str, *args):
+        """Dispatch a rule directly, skipping command-string parsing."""
+        rule = self.rules.get(rule_name)
+        if rule is not None:
+            return rule(*args)
         return None
 
 
@@ -50,19 +192,69 @@ class AgentSimulation:
     - Actions trigger rules that update reputations
     - The system maintains a health_score (average reputation)
     """
-    
-    def __init__(self, num_agents: int = 5):
+
+    # Fixed attribute set: avoids a per-instance __dict__ and makes
+    # attribute access an array lookup on the hot path
+    __slots__ = (
+        'num_agents', 'metta', 'rep', 'names', '_name_to_idx',
+        '_hist_cap', '_hist_actor', '_hist_action', '_hist_delta',
+        '_hist_len', '_hist_head', '_states_cache', '_states_cache_step',
+        '_dist_cache', 'step_count',
+        '_rng', '_action_p', '_cdf_table', '_step_fast', '_rep_sum',
+        '_use_metta',
+    )
+
+    def __init__(self, num_agents: int = 5, seed: int = None,
+                 history_maxlen: int = 10_000):
         """
         Initialize the simulation with a given number of agents.
         
         Args:
             num_agents: Number of agents to create in the simulation
+            seed: Optional RNG seed for reproducible runs
+            history_maxlen: Maximum number of recent actions retained
         """
         self.num_agents = num_agents
         self.metta = SimpleMeTTaRuntime()
-        self.agents: Dict[str, float] = {}
-        self.action_history: List[Tuple[str, str, float]] = []
+        # Reputations live in a contiguous float32 array (the 0-200 scale
+        # does not need double precision); self.names maps array slots
+        # back to agent names for the public dict-based API.
+        self.rep = np.empty(num_agents, dtype=np.float32)
+        self.names: List[str] = []
+        self._name_to_idx: Dict[str, int] = {}
+        # Action history stored as parallel columnar arrays used as a
+        # ring buffer: actor index, action code, and reputation delta
+        # per step. The bounded capacity keeps long dashboard sessions
+        # at constant memory; the oldest entries are overwritten first.
+        self._hist_cap = history_maxlen
+        self._hist_actor = np.empty(self._hist_cap, dtype=np.int32)
+        self._hist_action = np.empty(self._hist_cap, dtype=np.int8)
+        self._hist_delta = np.empty(self._hist_cap, dtype=np.float32)
+        self._hist_len = 0
+        self._hist_head = 0
+        # Shared per-step snapshot of get_agent_states (see below)
+        self._states_cache = None
+        self._states_cache_step = -1
+        # Last computed reputation distribution, keyed by step_count
+        self._dist_cache = (None, -1)
         self.step_count = 0
+        # Cached RNG state: reusing one Generator and a precomputed weight
+        # array avoids rebuilding the cumulative distribution every step.
+        self._rng = np.random.default_rng(seed)
+        self._action_p = np.array([0.4, 0.3, 0.2, 0.1])
+        # Inverse-CDF lookup table for the weighted action choice: one
+        # byte draw indexes straight into the action code. Quantizes the
+        # weights to 1/256 (102/77/51/26 entries for 0.4/0.3/0.2/0.1).
+        bounds = (102, 179, 230, 256)
+        self._cdf_table = bytes(
+            next(k for k, b in enumerate(bounds) if i < b)
+            for i in range(256))
+        self._step_fast = _build_specialized_step(num_agents,
+                                                  (0.4, 0.3, 0.2, 0.1))
+        # When True, step() routes actions through the rule runtime (the
+        # original, slower command-string path). Kept for validating that
+        # the inlined arithmetic below matches the rules.
+        self._use_metta = False
         
         # Initialize agents with random starting reputations
         self._initialize_agents()
@@ -75,11 +267,15 @@ class AgentSimulation:
     
     def _initialize_agents(self):
         """Create agents with initial reputation values."""
-        for i in range(self.num_agents):
-            agent_name = f"Agent_{i}"
-            # Start with reputation between 50 and 100
-            initial_reputation = random.uniform(50, 100)
-            self.agents[agent_name] = initial_reputation
+        self.names = [f"Agent_{i}" for i in range(self.num_agents)]
+        self._name_to_idx = {name: i for i, name in enumerate(self.names)}
+        # Start with reputations between 50 and 100, drawn in one
+        # vectorized call from the simulation's generator
+        self.rep = self._rng.uniform(
+            50.0, 100.0, size=self.num_agents).astype(np.float32)
+        # Running total of self.rep, maintained incrementally so
+        # get_health_score is O(1) instead of a per-call reduction
+        self._rep_sum = float(self.rep.sum())
     
     def _register_grounded_functions(self):
         """
@@ -89,30 +285,36 @@ class AgentSimulation:
         
         def update_reputation(agent_name: str, delta: str) -> float:
             """Update an agent's reputation by a delta value."""
+            idx = self._name_to_idx.get(agent_name)
             change = float(delta)
-            
-            if agent_name in self.agents:
-                old_rep = self.agents[agent_name]
+
+            if idx is not None:
+                old_rep = self.rep[idx]
                 # Keep reputation between 0 and 200
-                self.agents[agent_name] = max(0, min(200, old_rep + change))
-                return self.agents[agent_name]
+                self.rep[idx] = max(_REP_MIN, min(_REP_MAX, old_rep + change))
+                self._rep_sum += float(self.rep[idx] - old_rep)
+                return float(self.rep[idx])
             return 0
-        
+
         def get_reputation(agent_name: str) -> float:
             """Retrieve an agent's current reputation."""
-            if agent_name in self.agents:
-                return self.agents[agent_name]
+            idx = self._name_to_idx.get(agent_name)
+            if idx is not None:
+                return float(self.rep[idx])
             return 0
-        
+
         def transfer_reputation(from_agent: str, to_agent: str, amount: str) -> int:
             """Transfer reputation from one agent to another."""
+            from_idx = self._name_to_idx.get(from_agent)
+            to_idx = self._name_to_idx.get(to_agent)
             transfer_amount = float(amount)
-            
-            if from_agent in self.agents and to_agent in self.agents:
-                if self.agents[from_agent] >= transfer_amount:
-                    self.agents[from_agent] -= transfer_amount
+
+            if from_idx is not None and to_idx is not None:
+                if self.rep[from_idx] >= transfer_amount:
+                    self.rep[from_idx] -= transfer_amount
                     # Positive-sum: receiver gets 1.1x the amount
-                    self.agents[to_agent] += transfer_amount * 1.1
+                    self.rep[to_idx] += transfer_amount * 1.1
+                    self._rep_sum += transfer_amount * 0.1
                     return 1  # Success
             return 0  # Failure
         
@@ -147,7 +349,21 @@ class AgentSimulation:
         self.metta.add_rule('action-share', action_share)
         self.metta.add_rule('action-idle', action_idle)
         self.metta.add_rule('transfer-reputation', action_transfer)
+
+        # Bind the direct-call table: step() dispatches through these
+        # attributes instead of building and parsing command strings.
+        # metta.run stays available for symbolic callers.
+        self.metta.contribute = action_contribute
+        self.metta.share = action_share
+        self.metta.idle = action_idle
+        self.metta.transfer = action_transfer
     
+    def _pick_partner(self, actor_idx: int) -> int:
+        """Pick a uniform trade partner other than actor_idx in O(1)."""
+        j = int(self._rng.integers(0, self.num_agents - 1))
+        return j + (j >= actor_idx)
+
+
     def step(self) -> Dict[str, any]:
         """
         Execute one simulation step:
@@ -160,39 +376,59 @@ class AgentSimulation:
             Dictionary with step information (agent, action, reputation change)
         """
         self.step_count += 1
-        
-        # Select random agent
-        agent_name = random.choice(list(self.agents.keys()))
-        
-        # Select random action (weighted towards productive actions)
-        actions = ['contribute', 'share', 'trade', 'idle']
-        weights = [0.4, 0.3, 0.2, 0.1]  # Favor contribute and share
-        action = random.choices(actions, weights=weights)[0]
-        
-        old_reputation = self.agents[agent_name]
-        
-        # Execute action through rule system
-        if action == 'contribute':
-            result = self.metta.run(f"!(action-contribute {agent_name})")
-        elif action == 'share':
-            result = self.metta.run(f"!(action-share {agent_name})")
-        elif action == 'trade':
-            # Select another agent to trade with
-            other_agents = [a for a in self.agents.keys() if a != agent_name]
-            if other_agents:
-                partner = random.choice(other_agents)
-                transfer_amount = random.uniform(5, 15)
-                result = self.metta.run(
-                    f"!(transfer-reputation {agent_name} {partner} {transfer_amount})"
-                )
-        else:  # idle
-            result = self.metta.run(f"!(action-idle {agent_name})")
-        
-        new_reputation = self.agents[agent_name]
+
+        if self._use_metta:
+            # Select random agent
+            actor_idx = int(self._rng.integers(self.num_agents))
+            agent_name = self.names[actor_idx]
+
+            # Select random action (weighted towards productive actions;
+            # the weights favor contribute and share) via one byte draw
+            # into the precomputed inverse-CDF table
+            action_code = self._cdf_table[self._rng.integers(0, 256)]
+            action = _ACTIONS[action_code]
+
+            old_reputation = float(self.rep[actor_idx])
+
+            # Runtime path: dispatch through the typed entry points bound
+            # in _load_rules, skipping command-string parsing entirely.
+            if action == 'contribute':
+                self.metta.contribute(agent_name)
+            elif action == 'share':
+                self.metta.share(agent_name)
+            elif action == 'trade':
+                if self.num_agents > 1:
+                    partner = self.names[self._pick_partner(actor_idx)]
+                    transfer_amount = float(self._rng.uniform(5, 15))
+                    self.metta.transfer(agent_name, partner, transfer_amount)
+            else:  # idle
+                self.metta.idle(agent_name)
+        else:
+            # Specialized fast path: agent count, action weights, and clip
+            # bounds are baked into the generated step function; only
+            # trades need extra handling here.
+            actor_idx, action_code, old_reputation = self._step_fast(
+                self.rep, self._rng)
+            agent_name = self.names[actor_idx]
+            action = _ACTIONS[action_code]
+            partner_idx = -1
+            old_partner = 0.0
+            if action_code == 2:
+                if self.num_agents > 1:
+                    partner_idx = self._pick_partner(actor_idx)
+                    transfer_amount = float(self._rng.uniform(5, 15))
+                    old_partner = float(self.rep[partner_idx])
+                    _step_kernel(self.rep, action_code, actor_idx,
+                                 partner_idx, transfer_amount)
+            self._rep_sum += float(self.rep[actor_idx]) - old_reputation
+            if partner_idx >= 0:
+                self._rep_sum += float(self.rep[partner_idx]) - old_partner
+
+        new_reputation = float(self.rep[actor_idx])
         reputation_change = new_reputation - old_reputation
-        
+
         # Record action in history
-        self.action_history.append((agent_name, action, reputation_change))
+        self._record_action(actor_idx, action_code, reputation_change)
         
         return {
             'step': self.step_count,
@@ -204,6 +440,43 @@ class AgentSimulation:
             'health_score': self.get_health_score()
         }
     
+    def step_batch(self, n: int) -> Dict[str, any]:
+        """
+        Execute n simulation steps in bulk.
+
+        All random draws happen in one vectorized call each; the actions
+        themselves are applied in chronological order by a single
+        (Numba-compiled, when available) kernel, so balances are clamped
+        between actions exactly as in step(). Unlike step(), this does
+        not record per-step entries in action_history.
+
+        Args:
+            n: Number of steps to execute
+
+        Returns:
+            Summary dictionary with step count and health score
+        """
+        if n > 0 and self.num_agents > 0:
+            actors = self._rng.integers(0, self.num_agents, size=n)
+            acts = self._rng.choice(4, size=n, p=self._action_p)
+            if self.num_agents > 1:
+                partners = self._rng.integers(0, self.num_agents - 1,
+                                              size=n)
+                partners += partners >= actors
+            else:
+                partners = np.full(n, -1)
+            amounts = self._rng.uniform(5, 15, size=n)
+            _batch_kernel(self.rep, actors, acts, partners, amounts)
+
+            self.step_count += n
+            self._rep_sum = float(self.rep.sum())
+
+        return {
+            'step': self.step_count,
+            'steps_run': max(0, n),
+            'health_score': self.get_health_score(),
+        }
+
     def get_health_score(self) -> float:
         """
         Calculate system health score as average agent reputation.
@@ -211,28 +484,80 @@ class AgentSimulation:
         Returns:
             Average reputation across all agents (0-200 scale)
         """
-        if not self.agents:
+        if self.num_agents == 0:
             return 0.0
-        return sum(self.agents.values()) / len(self.agents)
-    
+        return self._rep_sum / self.num_agents
+
     def get_agent_states(self) -> Dict[str, float]:
         """
         Get current state of all agents.
-        
+
+        The dict is built once per step and shared between calls, so
+        repeated polling (as the dashboard does) costs O(1) after the
+        first read. Treat the returned dict as read-only.
+
         Returns:
             Dictionary mapping agent names to reputation values
         """
-        return self.agents.copy()
+        if self._states_cache is None or self._states_cache_step != self.step_count:
+            self._states_cache = dict(zip(self.names, self.rep.tolist()))
+            self._states_cache_step = self.step_count
+        return self._states_cache
     
+    def _record_action(self, actor_idx: int, action_code: int, delta: float):
+        """Append one step to the ring-buffered action history."""
+        i = self._hist_head
+        self._hist_actor[i] = actor_idx
+        self._hist_action[i] = action_code
+        self._hist_delta[i] = delta
+        self._hist_head = (i + 1) % self._hist_cap
+        if self._hist_len < self._hist_cap:
+            self._hist_len += 1
+
+    def _hist_columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the history columns in chronological order: zero-copy
+        slices until the ring wraps, concatenated copies afterwards.
+        """
+        if self._hist_len < self._hist_cap:
+            n = self._hist_len
+            return (self._hist_actor[:n], self._hist_action[:n],
+                    self._hist_delta[:n])
+        h = self._hist_head
+        return (np.concatenate((self._hist_actor[h:], self._hist_actor[:h])),
+                np.concatenate((self._hist_action[h:], self._hist_action[:h])),
+                np.concatenate((self._hist_delta[h:], self._hist_delta[:h])))
+
     def get_action_history(self) -> List[Tuple[str, str, float]]:
         """
         Get the history of all actions taken.
-        
+
         Returns:
             List of tuples (agent_name, action, reputation_change)
         """
-        return self.action_history.copy()
+        actor, action, delta = self._hist_columns()
+        return [
+            (self.names[a], _ACTIONS[k], float(d))
+            for a, k, d in zip(actor.tolist(), action.tolist(),
+                               delta.tolist())
+        ]
     
+    def get_action_history_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the action history as read-only column views, without copying.
+
+        Returns:
+            Tuple of (actor_index, action_code, delta) arrays in
+            chronological order. Until the ring buffer wraps these are
+            views valid only until the next step(); afterwards they are
+            fresh copies. Only the most recent history_maxlen entries
+            are retained.
+        """
+        columns = self._hist_columns()
+        for column in columns:
+            column.flags.writeable = False
+        return columns
+
     def reset(self, num_agents: int = None):
         """
         Reset the simulation to initial state.
@@ -242,33 +567,67 @@ class AgentSimulation:
         """
         if num_agents is not None:
             self.num_agents = num_agents
-        
-        self.agents.clear()
-        self.action_history.clear()
+            self._step_fast = _build_specialized_step(
+                self.num_agents, tuple(self._action_p.tolist()))
+
+        self._hist_len = 0
+        self._hist_head = 0
+        self._states_cache = None
+        self._dist_cache = (None, -1)
         self.step_count = 0
-        
+
         # Reinitialize
         self._initialize_agents()
-    
+
     def get_reputation_distribution(self) -> Dict[str, int]:
         """
         Categorize agents by reputation level.
-        
+
+        The result is cached per step, so repeated dashboard reads
+        between steps cost O(1).
+
         Returns:
             Dictionary with counts for 'high', 'medium', 'low' reputation
         """
-        distribution = {'high': 0, 'medium': 0, 'low': 0}
-        
-        for reputation in self.agents.values():
-            if reputation >= 100:
-                distribution['high'] += 1
-            elif reputation >= 50:
-                distribution['medium'] += 1
-            else:
-                distribution['low'] += 1
-        
-        return distribution
+        cached, cached_step = self._dist_cache
+        if cached is not None and cached_step == self.step_count:
+            return cached.copy()
 
+        high = int(np.count_nonzero(self.rep >= 100))
+        medium = int(np.count_nonzero((self.rep >= 50) & (self.rep < 100)))
+        distribution = {
+            'high': high,
+            'medium': medium,
+            'low': self.num_agents - high - medium,
+        }
+        self._dist_cache = (distribution, self.step_count)
+        return distribution.copy()
+
+
+def run_simulations_parallel(seeds, num_agents: int = 5,
+                             num_steps: int = 1000,
+                             max_workers: int = None) -> List['AgentSimulation']:
+    """
+    Run several independent simulations concurrently, one per seed.
+
+    Each run owns its own AgentSimulation (and reputation array), so no
+    shared state or locking is involved. With Numba installed the batch
+    kernels release the GIL (nogil), letting threads overlap on
+    multiple cores; scenario sweeps scale close to linearly.
 
+    Args:
+        seeds: Iterable of RNG seeds, one per simulation
+        num_agents: Number of agents in each simulation
+        num_steps: Number of steps each simulation runs
+        max_workers: Thread count (defaults to the CPU count)
 
+    Returns:
+        List of completed AgentSimulation objects, in seed order
+    """
+    def run_one(seed):
+        sim = AgentSimulation(num_agents=num_agents, seed=seed)
+        sim.step_batch(num_steps)
+        return sim
 
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as ex:
+        return list(ex.map(run_one, seeds))
@@ -10,6 +10,16 @@ Usage:
 """
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _safe_import(package):
+    """Import a package, returning (success, error message)."""
+    try:
+        __import__(package)
+        return True, None
+    except ImportError as e:
+        return False, str(e)
 
 
 def test_imports():
@@ -27,13 +37,20 @@ def test_imports():
     
     failed = []
     
-    for package, description in packages:
-        try:
-            __import__(package)
+    # Import in parallel: the heavy packages (streamlit, pandas,
+    # matplotlib) spend most of their import time in file I/O and
+    # C-extension init, which release the GIL, so wall time drops
+    # from the sum of import times to roughly the max.
+    with ThreadPoolExecutor(max_workers=len(packages)) as executor:
+        results = list(executor.map(
+            lambda p: _safe_import(p[0]), packages))
+    
+    for (package, description), (ok, error) in zip(packages, results):
+        if ok:
             print(f"  ✓ {package:15} - {description}")
-        except ImportError as e:
+        else:
             print(f"  ✗ {package:15} - {description} - FAILED")
-            failed.append((package, str(e)))
+            failed.append((package, error))
     
     if failed:
         print("\n❌ Some packages failed to import:")